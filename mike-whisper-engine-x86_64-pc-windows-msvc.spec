@@ -6,7 +6,7 @@ a = Analysis(
     pathex=['src', '.\\venv\\Lib\\site-packages'],
     binaries=[],
     datas=collect_data_files('faster_whisper'),
-    hiddenimports=['audio_recorder', 'transcriber', 'injector', 'faster_whisper', 'torch', 'sounddevice', 'keyboard', 'numpy', 'requests', 'pyperclip', 'onnxruntime'],
+    hiddenimports=['audio_recorder', 'transcriber', 'injector', 'wake_word', 'resource_manager', 'history_store', 'refiner', 'faster_whisper', 'torch', 'sounddevice', 'keyboard', 'numpy', 'psutil', 'requests', 'pyperclip', 'onnxruntime'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -5,8 +5,8 @@ a = Analysis(
     ['src\\sidecar_main.py'],
     pathex=[],
     binaries=[],
-    datas=collect_data_files('faster_whisper') + [('src/audio_recorder.py', '.'), ('src/injector.py', '.'), ('src/transcriber.py', '.')],
-    hiddenimports=['faster_whisper', 'torch', 'sounddevice', 'keyboard', 'numpy', 'requests', 'pyperclip', 'onnxruntime'],
+    datas=collect_data_files('faster_whisper') + [('src/audio_recorder.py', '.'), ('src/injector.py', '.'), ('src/transcriber.py', '.'), ('src/wake_word.py', '.'), ('src/resource_manager.py', '.'), ('src/history_store.py', '.'), ('src/refiner.py', '.')],
+    hiddenimports=['faster_whisper', 'torch', 'sounddevice', 'keyboard', 'numpy', 'psutil', 'requests', 'pyperclip', 'onnxruntime'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -1,6 +1,7 @@
 import sounddevice as sd
 import numpy as np
 import logging
+import queue
 import time
 
 logging.basicConfig(level=logging.INFO)
@@ -47,6 +48,18 @@ class AudioRecorder:
         self.timeout_triggered = False
         self.speech_detected_since_last_poll = False
         
+        # Always-listening mode: a cheap RMS gate runs before the VAD, and
+        # finished utterances are handed to the wake-word detector as windows.
+        self.is_listening = False
+        self.energy_floor = 0.01 # RMS below this never reaches the VAD
+        self.max_wake_window = 3.0 # Seconds of speech kept per wake window
+        self.wake_hangover_blocks = 3 # ~300ms of non-speech ends a window, bridging VAD dips between words
+        self.wake_silent_blocks = 0
+        self.wake_buffer = []
+        self.wake_queue = queue.Queue(maxsize=4)
+        self.listen_stats = {}
+        self.reset_listen_stats()
+        
         # Initialize the stream but don't start it yet
         self.stream = sd.InputStream(
             samplerate=self.sample_rate,
@@ -61,19 +74,12 @@ class AudioRecorder:
         if status:
             logger.warning(f"Audio Stream Status: {status}")
         if not self.is_recording:
+            if self.is_listening:
+                self._listen_callback(indata[:, 0].copy())
             return
             
         audio_data = indata[:, 0].copy()
-        
-        # Check VAD in 512-sample chunks
-        is_speech = False
-        for i in range(0, len(audio_data), 512):
-            chunk = audio_data[i:i+512]
-            if len(chunk) == 512:
-                prob = self.vad.process_chunk(chunk)
-                if prob > self.vad.threshold:
-                    is_speech = True
-                    break
+        is_speech = self._is_speech(audio_data)
                     
         current_time = time.time()
         
@@ -95,9 +101,112 @@ class AudioRecorder:
             if current_time - self.last_speech_time > self.silence_timeout:
                 self.timeout_triggered = True
 
-    def start_recording(self):
-        """Starts capturing audio into the buffer."""
-        self.recording_buffer = []
+    def _is_speech(self, audio_data):
+        """Runs the VAD over the block in 512-sample chunks."""
+        for i in range(0, len(audio_data), 512):
+            chunk = audio_data[i:i+512]
+            if len(chunk) == 512:
+                prob = self.vad.process_chunk(chunk)
+                if prob > self.vad.threshold:
+                    return True
+        return False
+
+    def _listen_callback(self, audio_data):
+        """Idle path for always-listening mode: energy gate, then VAD, then wake window."""
+        cpu_start = time.thread_time()
+        stats = self.listen_stats
+        stats["blocks"] += 1
+        
+        rms = float(np.sqrt(np.mean(audio_data ** 2)))
+        if rms < self.energy_floor:
+            stats["energy_gated"] += 1
+            is_speech = False
+        else:
+            stats["vad_runs"] += 1
+            is_speech = self._is_speech(audio_data)
+        
+        if is_speech:
+            self.wake_silent_blocks = 0
+            self.wake_buffer.append(audio_data)
+            window_seconds = len(self.wake_buffer) * self.blocksize / self.sample_rate
+            if window_seconds >= self.max_wake_window:
+                self._emit_wake_window()
+        elif self.wake_buffer:
+            # Keep trailing blocks so a short pause mid-phrase or the last word isn't clipped
+            self.wake_buffer.append(audio_data)
+            self.wake_silent_blocks += 1
+            if self.wake_silent_blocks >= self.wake_hangover_blocks:
+                self._emit_wake_window()
+        
+        stats["callback_cpu_s"] += time.thread_time() - cpu_start
+
+    def _emit_wake_window(self):
+        window = np.concatenate(self.wake_buffer, axis=0)
+        self.wake_buffer = []
+        self.wake_silent_blocks = 0
+        try:
+            self.wake_queue.put_nowait(window)
+            self.listen_stats["wake_windows"] += 1
+        except queue.Full:
+            # Detector is behind; dropping is cheaper than queueing stale audio
+            self.listen_stats["wake_windows_dropped"] += 1
+
+    def reset_listen_stats(self):
+        self.listen_stats = {
+            "blocks": 0,
+            "energy_gated": 0,
+            "vad_runs": 0,
+            "wake_windows": 0,
+            "wake_windows_dropped": 0,
+            "callback_cpu_s": 0.0,
+        }
+
+    def start_listening(self):
+        """Keeps the stream open and feeds wake windows while not recording."""
+        self.wake_buffer = []
+        self.wake_silent_blocks = 0
+        self.vad.reset_states()
+        self.reset_listen_stats()
+        self.is_listening = True
+        
+        if not self.stream.active:
+            self.stream.start()
+        logger.info("Started always-listening mode...")
+
+    def stop_listening(self):
+        self.is_listening = False
+        self.wake_buffer = []
+        while not self.wake_queue.empty():
+            try:
+                self.wake_queue.get_nowait()
+            except queue.Empty:
+                break
+        logger.info("Stopped always-listening mode.")
+
+    def drain_wake_audio(self):
+        """Takes all pending wake windows plus the partial window, oldest first."""
+        blocks = []
+        while True:
+            try:
+                blocks.append(self.wake_queue.get_nowait())
+            except queue.Empty:
+                break
+        blocks.extend(self.wake_buffer)
+        self.wake_buffer = []
+        self.wake_silent_blocks = 0
+        return blocks
+
+    def start_recording(self, preroll=None):
+        """
+        Starts capturing audio into the buffer.
+        preroll: Audio to seed the buffer with (the wake window). Speech heard while
+                 the wake phrase was being checked is appended after it.
+        """
+        buffer = []
+        if preroll is not None:
+            buffer.extend(preroll)
+            buffer.extend(self.drain_wake_audio())
+        self.recording_buffer = buffer
         self.ring_buffer = []
         self.is_recording = True
         self.timeout_triggered = False
@@ -119,6 +228,8 @@ class AudioRecorder:
     def stop_recording(self):
         """Stops capturing and returns the accumulated audio data."""
         self.is_recording = False
+        self.wake_buffer = []
+        self.vad.reset_states()
         logger.info("Stopped recording audio.")
         
         if not self.recording_buffer:
@@ -0,0 +1,233 @@
+import os
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+import re
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    entry_id TEXT UNIQUE NOT NULL,
+    created_at REAL NOT NULL,
+    raw_text TEXT NOT NULL,
+    formatted_text TEXT NOT NULL,
+    mode TEXT,
+    audio_duration REAL,
+    timings TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+    raw_text, formatted_text, content='history', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN
+    INSERT INTO history_fts(rowid, raw_text, formatted_text)
+    VALUES (new.id, new.raw_text, new.formatted_text);
+END;
+CREATE TRIGGER IF NOT EXISTS history_au AFTER UPDATE ON history BEGIN
+    INSERT INTO history_fts(history_fts, rowid, raw_text, formatted_text)
+    VALUES ('delete', old.id, old.raw_text, old.formatted_text);
+    INSERT INTO history_fts(rowid, raw_text, formatted_text)
+    VALUES (new.id, new.raw_text, new.formatted_text);
+END;
+CREATE TABLE IF NOT EXISTS history_audio (
+    entry_id TEXT PRIMARY KEY,
+    sample_rate INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+def default_history_path():
+    base_dir = os.environ.get("APPDATA") or os.path.expanduser("~")
+    return os.path.join(base_dir, "MikeWhisper", "history.db")
+
+class HistoryStore:
+    def __init__(self, db_path=None, sample_rate=16000, max_audio_entries=200, max_audio_age_days=30):
+        """
+        Append-only transcript history in SQLite with an FTS5 index.
+
+        Writes go through a queue to a single writer thread so the processing
+        thread never waits on disk. Reads use their own connection (WAL mode).
+
+        max_audio_entries: Most recent retained clips to keep; older audio is pruned.
+        max_audio_age_days: Retained audio older than this is pruned. None keeps it forever.
+        Transcript text is kept regardless; only the (much larger) audio expires.
+        """
+        self.db_path = db_path or default_history_path()
+        self.sample_rate = sample_rate
+        self.max_audio_entries = max_audio_entries
+        self.max_audio_age_days = max_audio_age_days
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self.write_queue = queue.Queue()
+        self.read_lock = threading.Lock()
+        self.read_conn = self._connect()
+        self.read_conn.executescript(SCHEMA)
+        self.read_conn.commit()
+
+        self.writer_thread = threading.Thread(target=self._writer_worker, daemon=True)
+        self.writer_thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _insert_audio(self, conn, entry_id, audio_data):
+        # Runs on the writer thread so compression stays off the processing path
+        pcm = (np.clip(audio_data.flatten(), -1.0, 1.0) * 32767).astype("<i2")
+        conn.execute(
+            "INSERT OR REPLACE INTO history_audio (entry_id, sample_rate, data) VALUES (?, ?, ?)",
+            (entry_id, self.sample_rate, zlib.compress(pcm.tobytes()))
+        )
+        self._prune_audio(conn)
+
+    def _prune_audio(self, conn):
+        if self.max_audio_entries is not None:
+            conn.execute(
+                "DELETE FROM history_audio WHERE rowid NOT IN "
+                "(SELECT rowid FROM history_audio ORDER BY rowid DESC LIMIT ?)",
+                (self.max_audio_entries,)
+            )
+        if self.max_audio_age_days is not None:
+            cutoff = time.time() - self.max_audio_age_days * 86400
+            conn.execute(
+                "DELETE FROM history_audio WHERE entry_id IN "
+                "(SELECT entry_id FROM history WHERE created_at < ?)",
+                (cutoff,)
+            )
+
+    def _writer_worker(self):
+        conn = self._connect()
+        try:
+            with conn:
+                self._prune_audio(conn) # Expire audio that aged out while the app was closed
+        except Exception as e:
+            logger.error(f"History audio pruning failed: {e}")
+
+        while True:
+            item = self.write_queue.get()
+            if item is None:
+                self.write_queue.task_done()
+                break
+
+            # Drain whatever else is queued into the same transaction
+            items = [item]
+            while True:
+                try:
+                    extra = self.write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    self.write_queue.put(None) # Handle shutdown after this batch
+                    self.write_queue.task_done()
+                    break
+                items.append(extra)
+
+            try:
+                with conn:
+                    for item in items:
+                        if callable(item):
+                            item(conn)
+                        else:
+                            conn.execute(*item)
+            except Exception as e:
+                logger.error(f"History write failed: {e}")
+            finally:
+                for _ in items:
+                    self.write_queue.task_done()
+        conn.close()
+
+    def add(self, raw_text, formatted_text, mode=None, audio_duration=None, timings=None, audio_data=None):
+        """
+        Queues a transcript for writing and returns its entry_id immediately.
+        audio_data (float32) is stored compressed when given, for re-transcription.
+        """
+        entry_id = uuid.uuid4().hex
+        self.write_queue.put((
+            "INSERT INTO history (entry_id, created_at, raw_text, formatted_text, mode, audio_duration, timings) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (entry_id, time.time(), raw_text, formatted_text, mode, audio_duration, json.dumps(timings or {}))
+        ))
+        if audio_data is not None and audio_data.size:
+            self.write_queue.put(lambda conn: self._insert_audio(conn, entry_id, audio_data))
+        return entry_id
+
+    def update_formatted_text(self, entry_id, formatted_text):
+        """Queues a replacement formatted text for an existing entry."""
+        self.write_queue.put((
+            "UPDATE history SET formatted_text = ? WHERE entry_id = ?",
+            (formatted_text, entry_id)
+        ))
+
+    @staticmethod
+    def _to_match_query(query):
+        # Quote each word so user input can't break FTS5 syntax; prefix-match the words
+        words = re.findall(r"\w+", query)
+        return " ".join(f'"{word}"*' for word in words)
+
+    @staticmethod
+    def _row_to_dict(row):
+        entry = dict(row)
+        entry.pop("id", None)
+        entry["timings"] = json.loads(entry["timings"] or "{}")
+        return entry
+
+    def search(self, query, limit=20):
+        """Full-text search over raw and formatted text, best matches first."""
+        match_query = self._to_match_query(query)
+        if not match_query:
+            return self.recent(limit)
+
+        with self.read_lock:
+            rows = self.read_conn.execute(
+                "SELECT h.* FROM history_fts JOIN history h ON h.id = history_fts.rowid "
+                "WHERE history_fts MATCH ? ORDER BY rank LIMIT ?",
+                (match_query, limit)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def get(self, entry_id):
+        """Returns a single entry by entry_id, or None."""
+        with self.read_lock:
+            row = self.read_conn.execute(
+                "SELECT * FROM history WHERE entry_id = ?", (entry_id,)
+            ).fetchone()
+        return self._row_to_dict(row) if row is not None else None
+
+    def recent(self, limit=20):
+        with self.read_lock:
+            rows = self.read_conn.execute(
+                "SELECT * FROM history ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def load_audio(self, entry_id):
+        """Returns retained float32 audio for an entry, or None if none was kept."""
+        with self.read_lock:
+            row = self.read_conn.execute(
+                "SELECT data FROM history_audio WHERE entry_id = ?", (entry_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        pcm = np.frombuffer(zlib.decompress(row["data"]), dtype="<i2")
+        return pcm.astype(np.float32) / 32767
+
+    def flush(self):
+        """Blocks until all queued writes are committed."""
+        self.write_queue.join()
+
+    def close(self):
+        self.write_queue.put(None)
+        self.writer_thread.join(timeout=5)
+        with self.read_lock:
+            self.read_conn.close()
@@ -1,52 +1,185 @@
 import keyboard
 import time
 import logging
+import threading
 import pyperclip
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class KeyboardBackend:
+    """OS-level injection primitives via the system clipboard and `keyboard`."""
+    name = "keyboard"
+
+    def get_clipboard(self):
+        return pyperclip.paste()
+
+    def set_clipboard(self, text):
+        pyperclip.copy(text)
+
+    def send_paste(self):
+        # Press and release as one combo instead of press/sleep/release
+        keyboard.send('ctrl+v')
+
+    def type_text(self, text):
+        keyboard.write(text, delay=0)
+
+    def modifiers_held(self):
+        return any(keyboard.is_pressed(key) for key in ('ctrl', 'shift', 'alt'))
+
+class RecordingBackend:
+    """No-op backend that records what would have been injected. Used by tests."""
+    name = "recording"
+
+    def __init__(self, clipboard=""):
+        self.clipboard = clipboard
+        self.calls = []
+
+    def get_clipboard(self):
+        return self.clipboard
+
+    def set_clipboard(self, text):
+        self.calls.append(("set_clipboard", text))
+        self.clipboard = text
+
+    def send_paste(self):
+        self.calls.append(("paste", self.clipboard))
+
+    def type_text(self, text):
+        self.calls.append(("type", text))
+
+    def modifiers_held(self):
+        return False
+
 class TextInjector:
-    def __init__(self, delay=0.1):
+    def __init__(self, delay=0.1, backend=None, typing_threshold=24, restore_clipboard=True):
         """
-        delay: Small delay before typing to ensure OS context is correct.
+        delay: Longest wait for hotkey modifiers to be released before injecting.
+        backend: Injection backend (defaults to KeyboardBackend).
+        typing_threshold: Single-line text up to this many characters is typed
+                          directly instead of pasted, skipping the clipboard round trip.
+        restore_clipboard: Put the user's clipboard back after pasting.
         """
         self.delay = delay
+        self.backend = backend or KeyboardBackend()
+        self.typing_threshold = typing_threshold
+        self.restore_clipboard = restore_clipboard
+        self.poll_interval = 0.005
+        self.clipboard_timeout = 0.2
+        # Targets like Office and Electron read the clipboard asynchronously after Ctrl+V,
+        # so the user's clipboard comes back later on a timer, off the latency path
+        self.restore_delay = 0.3
+        self._restore_lock = threading.Lock()
+        self._restore_timer = None
+        self._restore_generation = 0
+        self._saved_clipboard = None
+
+        self.last_latency_ms = 0.0
+        self.stats = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+    def _wait_until(self, condition, timeout):
+        """Polls condition until it holds or timeout expires. Returns the final result."""
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def _restore_clipboard(self, generation):
+        # Timer.cancel() can't stop a timer that already fired, so a stale restore
+        # checks the generation and bows out if another paste has started since
+        with self._restore_lock:
+            if generation != self._restore_generation:
+                return
+            saved = self._saved_clipboard
+            self._saved_clipboard = None
+            self._restore_timer = None
+            if saved:
+                try:
+                    self.backend.set_clipboard(saved)
+                except Exception as e:
+                    logger.warning(f"Could not restore clipboard: {e}")
+
+    def _schedule_restore(self):
+        with self._restore_lock:
+            self._restore_timer = threading.Timer(
+                self.restore_delay, self._restore_clipboard, args=(self._restore_generation,)
+            )
+            self._restore_timer.daemon = True
+            self._restore_timer.start()
+
+    def finish_pending_restore(self):
+        """Restores the user's clipboard now if a delayed restore is still pending."""
+        with self._restore_lock:
+            timer = self._restore_timer
+            if timer is not None:
+                timer.cancel()
+            generation = self._restore_generation
+        if timer is not None:
+            self._restore_clipboard(generation)
+
+    def _paste(self, text):
+        if self.restore_clipboard:
+            with self._restore_lock:
+                # Invalidate any restore that is scheduled or already running
+                self._restore_generation += 1
+                if self._restore_timer is not None:
+                    # A previous paste hasn't restored yet; the clipboard holds our text,
+                    # so keep the user's original value from that paste
+                    self._restore_timer.cancel()
+                    self._restore_timer = None
+                else:
+                    try:
+                        saved = self.backend.get_clipboard()
+                    except Exception as e:
+                        logger.warning(f"Could not save clipboard: {e}")
+                        saved = None
+                    # Empty means non-text content (e.g. an image) we can't restore anyway
+                    self._saved_clipboard = saved if saved and saved != text else None
+
+        try:
+            self.backend.set_clipboard(text)
+            # Wait until we actually own the clipboard rather than sleeping a fixed time
+            if not self._wait_until(lambda: self.backend.get_clipboard() == text, self.clipboard_timeout):
+                logger.warning("Clipboard did not update in time, pasting anyway")
+            self.backend.send_paste()
+        finally:
+            if self._saved_clipboard:
+                self._schedule_restore()
 
     def inject(self, text):
         """
-        Injects text via the clipboard (Copy + Paste).
-        This method is much more reliable for preserving newlines (bullet points)
-        and paragraphs compared to simulated typing.
+        Injects text, typing short single-line strings and pasting everything else
+        via the clipboard (Copy + Paste), which preserves newlines (bullet points)
+        and paragraphs. Returns the injection latency in milliseconds.
         """
         if not text:
-            return
+            return 0.0
 
         logger.info(f"Injecting formatted text: '{text[:20]}...'")
-        
-        # Small sleep helps if the user just released a hotkey
-        time.sleep(self.delay)
-        
+        start_time = time.perf_counter()
+
+        # Don't paste while the user is still releasing the hotkey
+        self._wait_until(lambda: not self.backend.modifiers_held(), self.delay)
+
         try:
-            # 1. Save original clipboard content (Optional, but let's keep it simple for now)
-            # 2. Set new content
-            pyperclip.copy(text)
-            
-            # 3. Trigger Ctrl+V
-            # We use a small delay between key presses for OS stability
-            keyboard.press('ctrl')
-            keyboard.press('v')
-            time.sleep(0.05)
-            keyboard.release('v')
-            keyboard.release('ctrl')
-            
-            # Small footer sleep to ensure paste is registered before clipboard changes
-            time.sleep(0.1)
-            
+            if len(text) <= self.typing_threshold and "\n" not in text:
+                self.backend.type_text(text)
+            else:
+                self._paste(text)
         except Exception as e:
             logger.error(f"Failed to inject text via clipboard: {e}")
             # Fallback to direct typing if clipboard fails
             try:
-                keyboard.write(text)
-            except:
-                pass
+                self.backend.type_text(text)
+            except Exception as e:
+                logger.error(f"Fallback typing failed: {e}")
+
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        self.last_latency_ms = latency_ms
+        self.stats["count"] += 1
+        self.stats["total_ms"] += latency_ms
+        self.stats["max_ms"] = max(self.stats["max_ms"], latency_ms)
+        logger.info(f"Injection took {latency_ms:.1f}ms ({self.backend.name})")
+        return latency_ms
@@ -12,6 +12,7 @@ from audio_recorder import AudioRecorder
 from transcriber import Transcriber
 from hotkeys import HotkeyManager
 from injector import TextInjector
+from resource_manager import ResourceManager
 
 # Configure logging
 logging.basicConfig(
@@ -27,7 +28,9 @@ class MikeWhisperApp:
         # Initialize components
         self.recorder = AudioRecorder()
         # Using base.en for better quality/speed balance in MVP
-        self.transcriber = Transcriber(model_size="base.en")
+        self.resources = ResourceManager()
+        logger.info(f"Resource plan: {self.resources.report()}")
+        self.transcriber = Transcriber(model_size="base.en", **self.resources.plan_threads())
         self.injector = TextInjector()
         
         self.processing_queue = queue.Queue()
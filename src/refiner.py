@@ -0,0 +1,132 @@
+import difflib
+import gc
+import logging
+import queue
+import threading
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def word_diff(original, refined):
+    """Word-level diff as a list of {"op", "from", "to"} for the changed spans."""
+    original_words = original.split()
+    refined_words = refined.split()
+    matcher = difflib.SequenceMatcher(a=original_words, b=refined_words, autojunk=False)
+    return [
+        {
+            "op": op,
+            "from": " ".join(original_words[i1:i2]),
+            "to": " ".join(refined_words[j1:j2])
+        }
+        for op, i1, i2, j1, j2 in matcher.get_opcodes()
+        if op != "equal"
+    ]
+
+class BackgroundRefiner:
+    def __init__(self, transcriber_factory, on_result, is_busy=None, resources=None,
+                 idle_timeout=300.0, max_pending=8):
+        """
+        Re-transcribes finished dictations with a larger model in the background.
+
+        transcriber_factory: Callable returning the larger Transcriber; called lazily
+                             on the first job and again after an idle unload.
+        on_result: Called with {"entry_id", "original", "text", "diff", ...} when the
+                   refined text differs from the original.
+        is_busy: Callable returning True while live dictation needs the CPU; jobs wait.
+        resources: Optional ResourceManager used to drop the worker's thread priority.
+        idle_timeout: Seconds without jobs before the larger model is unloaded.
+        """
+        self.transcriber_factory = transcriber_factory
+        self.on_result = on_result
+        self.is_busy = is_busy or (lambda: False)
+        self.resources = resources
+        self.idle_timeout = idle_timeout
+        self.busy_poll = 0.25
+        # Whisper decodes 30s windows anyway, so splitting there costs little accuracy
+        # and gives a point to yield to live dictation mid-clip
+        self.chunk_samples = 30 * 16000
+
+        self.transcriber = None
+        self.last_used = 0.0
+        self.job_queue = queue.Queue(maxsize=max_pending)
+        self.is_running = True
+        self.worker_thread = threading.Thread(target=self._refine_worker, daemon=True)
+        self.worker_thread.start()
+
+    def submit(self, audio_data, original_text, entry_id=None, formatted_text=None):
+        """Queues audio for refinement. Returns False if the backlog is full."""
+        try:
+            self.job_queue.put_nowait({
+                "entry_id": entry_id,
+                "audio_data": audio_data,
+                "original": original_text,
+                "formatted_text": formatted_text
+            })
+            return True
+        except queue.Full:
+            logger.warning("Refinement backlog full, skipping this dictation")
+            return False
+
+    def _unload(self):
+        logger.info("Refinement model idle, unloading...")
+        self.transcriber = None
+        gc.collect()
+
+    def _refine_worker(self):
+        if self.resources is not None:
+            self.resources.lower_current_thread_priority()
+
+        while self.is_running:
+            try:
+                job = self.job_queue.get(timeout=1.0)
+            except queue.Empty:
+                if self.transcriber is not None and time.time() - self.last_used > self.idle_timeout:
+                    self._unload()
+                continue
+
+            try:
+                self._run_job(job)
+            except Exception as e:
+                logger.error(f"Refinement failed: {e}")
+            finally:
+                self.last_used = time.time()
+                self.job_queue.task_done()
+
+    def _wait_until_idle(self):
+        """Blocks while live dictation is busy. Returns False if the refiner was stopped."""
+        while self.is_running and self.is_busy():
+            time.sleep(self.busy_poll)
+        return self.is_running
+
+    def _run_job(self, job):
+        if self.transcriber is None:
+            logger.info("Loading refinement model...")
+            self.transcriber = self.transcriber_factory()
+
+        audio_data = job["audio_data"].flatten()
+        texts = []
+        refine_ms = 0.0
+        for start in range(0, audio_data.size, self.chunk_samples):
+            if not self._wait_until_idle():
+                return
+            start_time = time.perf_counter()
+            texts.append(self.transcriber.transcribe(audio_data[start:start + self.chunk_samples]))
+            refine_ms += (time.perf_counter() - start_time) * 1000
+        text = " ".join(t for t in texts if t)
+
+        if not text or text == job["original"]:
+            logger.info(f"Refinement unchanged ({refine_ms:.0f}ms)")
+            return
+
+        self.on_result({
+            "entry_id": job["entry_id"],
+            "original": job["original"],
+            "formatted_text": job["formatted_text"],
+            "text": text,
+            "diff": word_diff(job["original"], text),
+            "refine_ms": round(refine_ms, 1)
+        })
+
+    def stop(self):
+        self.is_running = False
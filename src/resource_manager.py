@@ -0,0 +1,93 @@
+import os
+import sys
+import logging
+import threading
+
+try:
+    import psutil
+except ImportError: # Optional: falls back to os-level estimates
+    psutil = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+THREAD_PRIORITY_BELOW_NORMAL = -1 # Win32 SetThreadPriority value
+
+def detect_physical_cores():
+    """Returns the number of physical CPU cores, estimated if psutil is unavailable."""
+    if psutil is not None:
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    logical = os.cpu_count() or 1
+    # Assume SMT (two hardware threads per core) when we can't ask the OS
+    return max(1, logical // 2)
+
+class ResourceManager:
+    def __init__(self, high_load_threshold=0.85):
+        """
+        Sizes transcription threads to the machine and gates speculative work.
+
+        high_load_threshold: System CPU load (0-1) above which partial decodes pause.
+        """
+        self.physical_cores = detect_physical_cores()
+        self.logical_cores = os.cpu_count() or self.physical_cores
+        self.high_load_threshold = high_load_threshold
+        self.partials_paused = 0
+
+        if psutil is not None:
+            psutil.cpu_percent(interval=None) # Prime the counter; first call always returns 0
+
+    def plan_threads(self):
+        """
+        Returns {"cpu_threads", "num_workers"} for the main Transcriber.
+        One worker gets every core but one, which stays free for audio capture
+        and the UI; partials are gated rather than run alongside the final decode.
+        """
+        return {"cpu_threads": max(1, self.physical_cores - 1), "num_workers": 1}
+
+    def system_load(self):
+        """Returns current system CPU load as a 0-1 fraction, or None if unknown."""
+        if psutil is not None:
+            return psutil.cpu_percent(interval=None) / 100.0
+        if hasattr(os, "getloadavg"):
+            return min(1.0, os.getloadavg()[0] / self.logical_cores)
+        return None
+
+    def should_pause_partials(self):
+        """True when the system is busy enough that speculative partial decodes should wait."""
+        load = self.system_load()
+        if load is not None and load >= self.high_load_threshold:
+            self.partials_paused += 1
+            return True
+        return False
+
+    def lower_current_thread_priority(self):
+        """
+        Lowers the OS priority of the calling thread. Used by the partial
+        transcription worker so it yields to the final decode and audio thread.
+        """
+        try:
+            if sys.platform == "win32":
+                import ctypes
+                kernel32 = ctypes.windll.kernel32
+                return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_BELOW_NORMAL))
+            if sys.platform.startswith("linux"):
+                # Linux applies nice values per thread ID
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+                return True
+        except Exception as e:
+            logger.warning(f"Could not lower thread priority: {e}")
+        return False
+
+    def report(self):
+        """Returns the detected hardware and chosen configuration."""
+        report = {
+            "physical_cores": self.physical_cores,
+            "logical_cores": self.logical_cores,
+            "high_load_threshold": self.high_load_threshold,
+            "load_source": "psutil" if psutil is not None else ("loadavg" if hasattr(os, "getloadavg") else "none"),
+            "partials_paused": self.partials_paused,
+        }
+        report.update(self.plan_threads())
+        return report
@@ -20,6 +20,10 @@ sys.path.append(bundle_dir)
 from audio_recorder import AudioRecorder
 from transcriber import Transcriber
 from injector import TextInjector
+from wake_word import WakeWordDetector
+from resource_manager import ResourceManager
+from history_store import HistoryStore
+from refiner import BackgroundRefiner
 
 # Configure logging to stderr so it doesn't mess with stdout IPC
 logging.basicConfig(
@@ -32,23 +36,41 @@ logger = logging.getLogger("MikeWhisperSidecar")
 class MikeWhisperSidecar:
     def __init__(self):
         logger.info("Initializing MikeWhisper Sidecar Engine...")
+        self.stdout_lock = threading.Lock()
         print(json.dumps({"type": "STATUS", "data": "INITIALIZING"}), flush=True)
         self.recorder = AudioRecorder()
-        self.transcriber = Transcriber(model_size="base.en")
+        self.resources = ResourceManager()
+        self.thread_plan = self.resources.plan_threads()
+        self.transcriber = Transcriber(model_size="base.en", **self.thread_plan)
         self.injector = TextInjector()
         
         self.processing_queue = queue.Queue()
         self.is_running = True
         self.is_live = False
+        self.is_processing = False # True while _process_worker handles a dictation
+        self.is_listening = False
+        self.listening_generation = 0 # Lets a stale listening worker notice it was replaced
+        self.wake_triggered = False # Current recording started from a wake phrase
+        self.wake_detector = None # Lazily loaded on first START_LISTENING
+        self.metrics_interval = 30.0
         self.config = {
             "api_key": "",
-            "mode": "raw"
+            "mode": "raw",
+            "wake_phrase": "hey mike",
+            "history": True,
+            "retain_audio": False,
+            "two_pass": False,
+            "refine_model": "small.en"
         }
+        self.refiner = None # Lazily created on the first two-pass dictation
+        self.history = None # Opened on first use, and never while history is disabled
         
         # Start processing worker
         self.processor_thread = threading.Thread(target=self._process_worker, daemon=True)
         self.processor_thread.start()
         
+        self._send_event("RESOURCES", self.resources.report())
+        
         # Send Ready signal
         self._send_event("READY")
 
@@ -57,7 +79,14 @@ class MikeWhisperSidecar:
         message = {"type": event_type}
         if data:
             message["data"] = data
-        print(json.dumps(message), flush=True)
+        line = json.dumps(message)
+        # Several worker threads emit events; keep each line whole on stdout
+        with self.stdout_lock:
+            print(line, flush=True)
+
+    def _idle_status(self):
+        """Status to return to once a dictation has finished."""
+        return "LISTENING" if self.is_listening else "READY"
 
     def _format_text_ai(self, text):
         """Uses OpenRouter to format the transcribed text based on the current mode."""
@@ -104,6 +133,8 @@ class MikeWhisperSidecar:
     def _partial_transcription_worker(self):
         """Worker thread to transcribe partial data while recording."""
         logger.info("Starting partial transcription worker...")
+        # Partials are speculative; let the final decode and audio thread win
+        self.resources.lower_current_thread_priority()
         while self.is_live:
             time.sleep(1.0)  # Throttled to 1000ms
             if not self.is_live:
@@ -116,45 +147,320 @@ class MikeWhisperSidecar:
                 self.is_live = False
                 audio_data = self.recorder.stop_recording()
                 if audio_data.size > 0:
-                    self.processing_queue.put(audio_data)
+                    self.processing_queue.put((audio_data, self.wake_triggered))
                 else:
-                    self._send_event("STATUS", "READY")
+                    self._send_event("STATUS", self._idle_status())
                 break
 
             # Only transcribe partial if user actually spoke since last tick
             if getattr(self.recorder, 'speech_detected_since_last_poll', False):
+                # Under heavy load (or while a final decode runs) skip this tick;
+                # the flag stays set so the partial catches up once things calm down
+                if self.is_processing or self.resources.should_pause_partials():
+                    continue
                 self.recorder.speech_detected_since_last_poll = False
                 audio_data = self.recorder.get_current_buffer()
                 if audio_data.size > 16000: # At least 1 second
                     text = self.transcriber.transcribe(audio_data)
+                    if text and self.wake_triggered:
+                        text = self.wake_detector.strip_wake_phrase(text)
                     if text and self.is_live:
                         self._send_event("PARTIAL_RESULT", text)
 
+    def _start_live_recording(self, wake_window=None):
+        """
+        Starts recording and the partial transcription worker.
+        wake_window: Audio that contained the wake phrase; it seeds the recording so
+                     words spoken right after the phrase aren't lost.
+        """
+        self.wake_triggered = wake_window is not None
+        self.recorder.start_recording(preroll=[wake_window] if self.wake_triggered else None)
+        self.is_live = True
+        self.partial_thread = threading.Thread(target=self._partial_transcription_worker, daemon=True)
+        self.partial_thread.start()
+        self._send_event("STATUS", "RECORDING")
+
+    def _load_wake_detector(self):
+        """Loads the wake-word model on first use. Returns False if it could not be loaded."""
+        if self.wake_detector is not None:
+            return True
+        try:
+            # tiny.en on short windows is cheap enough to act as the keyword spotter
+            self.wake_detector = WakeWordDetector(
+                Transcriber(model_size="tiny.en", cpu_threads=min(2, self.thread_plan["cpu_threads"])),
+                wake_phrases=[self.config.get("wake_phrase", "hey mike")]
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Could not load wake-word model: {e}")
+            self._send_event("ERROR", f"Always-listening unavailable: {e}")
+            return False
+
+    def _is_idle(self):
+        """True when nothing but the listening path should be using the CPU."""
+        if self.is_live or self.is_processing or not self.processing_queue.empty():
+            return False
+        return self.refiner is None or self.refiner.job_queue.unfinished_tasks == 0
+
+    def _listening_worker(self, generation):
+        """Worker thread that checks wake windows and reports idle CPU usage."""
+        logger.info("Starting always-listening worker...")
+        is_current = lambda: self.is_listening and generation == self.listening_generation
+        
+        # Model load happens here so a slow or failed download never blocks the command thread
+        if not self._load_wake_detector():
+            if generation == self.listening_generation:
+                self.is_listening = False
+                self.recorder.stop_listening()
+                self._send_event("STATUS", self._idle_status())
+            return
+        if not is_current(): # STOP_LISTENING arrived while the model loaded
+            return
+        self._send_event("STATUS", "LISTENING")
+        
+        last_report = time.time()
+        last_cpu = time.process_time()
+        
+        while is_current():
+            try:
+                window = self.recorder.wake_queue.get(timeout=0.5)
+            except queue.Empty:
+                window = None
+            
+            # Ignore windows while dictating or finishing a previous dictation
+            if window is not None and not self.is_live and not self.is_processing:
+                if self.wake_detector.detect(window) and is_current():
+                    self._send_event("WAKE_WORD", self.config.get("wake_phrase"))
+                    self._start_live_recording(wake_window=window)
+            
+            now = time.time()
+            if not self._is_idle():
+                # Dictation, formatting and refinement aren't idle cost; restart the window
+                last_report = now
+                last_cpu = time.process_time()
+            elif now - last_report >= self.metrics_interval:
+                self._report_listen_metrics(now - last_report, time.process_time() - last_cpu)
+                last_report = now
+                last_cpu = time.process_time()
+
+    def _report_listen_metrics(self, wall_s, cpu_s):
+        stats = dict(self.recorder.listen_stats)
+        stats["idle_cpu_percent"] = round(100.0 * cpu_s / wall_s, 2) if wall_s > 0 else 0.0
+        stats["callback_cpu_s"] = round(stats["callback_cpu_s"], 3)
+        logger.info(f"Listening metrics: {stats}")
+        self._send_event("METRICS", {"listening": stats})
+
+    def _start_listening(self):
+        if self.is_listening:
+            return
+        self.recorder.start_listening()
+        self.is_listening = True
+        # A worker from a quick STOP/START may still be in its 0.5s poll; the new
+        # generation makes it exit instead of sharing wake_queue with this one
+        self.listening_generation += 1
+        self.listening_thread = threading.Thread(
+            target=self._listening_worker, args=(self.listening_generation,), daemon=True
+        )
+        self.listening_thread.start()
+
+    def _stop_listening(self):
+        if not self.is_listening:
+            return
+        self.is_listening = False
+        self.recorder.stop_listening()
+        # A wake-triggered dictation keeps going; report what the engine is actually doing
+        if self.is_live:
+            self._send_event("STATUS", "RECORDING")
+        elif self.is_processing or not self.processing_queue.empty():
+            self._send_event("STATUS", "PROCESSING")
+        else:
+            self._send_event("STATUS", self._idle_status())
+
     def _process_worker(self):
         while self.is_running:
             try:
-                audio_data = self.processing_queue.get(timeout=0.5)
+                audio_data, wake_triggered = self.processing_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            # Set for the whole transcribe/format/inject pass so speculative work backs off
+            self.is_processing = True
+            try:
                 self._send_event("STATUS", "PROCESSING")
+                timings = {}
                 
-                text = self.transcriber.transcribe(audio_data)
+                start_time = time.perf_counter()
+                text, discards = self.transcriber.transcribe_with_report(audio_data)
+                if text and wake_triggered:
+                    # The recording was seeded with the wake window; drop the phrase itself
+                    text = self.wake_detector.strip_wake_phrase(text)
+                timings["transcribe_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+                if discards:
+                    # Tell the UI why nothing (or less) was pasted
+                    self._send_event("DISCARDED", discards)
                 
                 if text:
                     # Apply AI formatting if enabled
+                    start_time = time.perf_counter()
                     final_text = self._format_text_ai(text)
+                    timings["format_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
                     
                     # Inject text directly
-                    self.injector.inject(final_text)
+                    inject_ms = self.injector.inject(final_text)
+                    timings["inject_ms"] = round(inject_ms, 1)
                     self._send_event("RESULT", final_text)
+                    self._send_event("METRICS", {"inject_ms": timings["inject_ms"]})
+                    entry_id = self._record_history(text, final_text, audio_data, timings)
+                    if self.config.get("two_pass"):
+                        self._get_refiner().submit(audio_data, text, entry_id=entry_id, formatted_text=final_text)
                 else:
                     self._send_event("STATUS", "NO_SPEECH")
                 
-                self._send_event("STATUS", "READY")
-                self.processing_queue.task_done()
-            except queue.Empty:
-                continue
+                self._send_event("STATUS", self._idle_status())
             except Exception as e:
                 logger.error(f"Error in sidecar worker: {e}")
                 self._send_event("ERROR", str(e))
+            finally:
+                self.is_processing = False
+                self.processing_queue.task_done()
+
+    def _get_history(self):
+        """Returns the history store, opening it on first use while history is enabled."""
+        if self.history is None and self.config.get("history", True):
+            try:
+                self.history = HistoryStore()
+            except Exception as e:
+                logger.error(f"History disabled, could not open store: {e}")
+        return self.history
+
+    def _record_history(self, raw_text, final_text, audio_data, timings):
+        """Queues the transcript for the history store; returns its entry_id or None."""
+        if not self.config.get("history", True) or self._get_history() is None:
+            return None
+        return self.history.add(
+            raw_text,
+            final_text,
+            mode=self.config.get("mode"),
+            audio_duration=round(audio_data.size / self.recorder.sample_rate, 2),
+            timings=timings,
+            audio_data=audio_data if self.config.get("retain_audio") else None
+        )
+
+    def _refiner_should_wait(self):
+        """Refinement only runs when nothing live is happening and the machine isn't loaded."""
+        # is_processing covers the final decode after its clip has left the queue
+        if self.is_live or self.is_processing or not self.processing_queue.empty():
+            return True
+        load = self.resources.system_load()
+        return load is not None and load >= self.resources.high_load_threshold
+
+    def _get_refiner(self):
+        if self.refiner is None:
+            model_size = self.config.get("refine_model", "small.en")
+            # Lowered thread priority doesn't reach CTranslate2's compute pool, so the
+            # thread cap is what keeps an in-flight refinement from crowding live dictation
+            refine_threads = min(2, self.thread_plan["cpu_threads"])
+            self.refiner = BackgroundRefiner(
+                transcriber_factory=lambda: Transcriber(model_size=model_size, cpu_threads=refine_threads),
+                on_result=self._on_refined,
+                is_busy=self._refiner_should_wait,
+                resources=self.resources
+            )
+        return self.refiner
+
+    def _on_refined(self, result):
+        formatted_text = result.pop("formatted_text")
+        # Only raw-mode entries store the transcript verbatim; AI-formatted ones keep their text
+        if self.history is not None and result["entry_id"] and formatted_text == result["original"]:
+            self.history.update_formatted_text(result["entry_id"], result["text"])
+        self._send_event("REFINED_RESULT", result)
+
+    def _refine_history_entry(self, data):
+        """Queues a retained-audio history entry for re-transcription with the larger model."""
+        if not isinstance(data, dict) or not isinstance(data.get("entry_id"), str):
+            self._send_event("ERROR", "REFINE_HISTORY expects data to be an object with a string entry_id")
+            return
+        entry_id = data["entry_id"]
+        history = self._get_history()
+        entry = history.get(entry_id) if history and entry_id else None
+        audio_data = history.load_audio(entry_id) if entry else None
+        if audio_data is None:
+            self._send_event("ERROR", f"No retained audio for history entry {entry_id}")
+            return
+        self._get_refiner().submit(audio_data, entry["raw_text"], entry_id=entry_id,
+                                   formatted_text=entry["formatted_text"])
+
+    def _search_history(self, data):
+        if not isinstance(data, dict):
+            self._send_event("ERROR", "SEARCH_HISTORY expects data to be an object")
+            return
+        query = data.get("query", "")
+        limit = data.get("limit", 20)
+        if not isinstance(query, str):
+            self._send_event("ERROR", "SEARCH_HISTORY query must be a string")
+            return
+        if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= 500:
+            self._send_event("ERROR", "SEARCH_HISTORY limit must be an integer between 1 and 500")
+            return
+        
+        start_time = time.perf_counter()
+        history = self._get_history()
+        results = history.search(query, limit=limit) if history else []
+        self._send_event("HISTORY_RESULTS", {
+            "query": query,
+            "results": results,
+            "elapsed_ms": round((time.perf_counter() - start_time) * 1000, 2)
+        })
+
+    def _handle_json_command(self, cmd_data):
+        if not isinstance(cmd_data, dict):
+            raise ValueError(f"Expected a JSON object, got: {cmd_data!r}")
+        
+        if cmd_data.get("type") == "SET_CONFIG":
+            self.config.update(cmd_data.get("data", {}))
+            if self.wake_detector is not None:
+                self.wake_detector.set_wake_phrases([self.config.get("wake_phrase", "hey mike")])
+            logger.info(f"Updated config: {self.config.get('mode')}")
+        elif cmd_data.get("type") == "SEARCH_HISTORY":
+            self._search_history(cmd_data.get("data", {}))
+        elif cmd_data.get("type") == "REFINE_HISTORY":
+            self._refine_history_entry(cmd_data.get("data", {}))
+        else:
+            logger.warning(f"Received unknown JSON command: {cmd_data}")
+
+    def _handle_command(self, command):
+        """Handles a plain string command. Returns False when the sidecar should exit."""
+        logger.info(f"Received command: {command}")
+        
+        if command == "PING":
+            self._send_event("STATUS", self._idle_status())
+        elif command == "START_RECORDING":
+            self._start_live_recording()
+        
+        elif command == "START_LISTENING":
+            self._start_listening()
+        
+        elif command == "STOP_LISTENING":
+            self._stop_listening()
+        
+        elif command == "STOP_RECORDING":
+            self.is_live = False
+            audio_data = self.recorder.stop_recording()
+            if audio_data.size > 0:
+                self.processing_queue.put((audio_data, self.wake_triggered))
+            else:
+                self._send_event("STATUS", self._idle_status())
+        
+        elif command == "EXIT":
+            self.is_listening = False
+            self.is_running = False
+            self.injector.finish_pending_restore()
+            if self.refiner is not None:
+                self.refiner.stop()
+            if self.history is not None:
+                self.history.close()
+            return False
+        return True
 
     def run(self):
         """Listen for commands from stdin."""
@@ -166,46 +472,20 @@ class MikeWhisperSidecar:
                 if not line:
                     continue
                 
-                # Handle JSON commands (for config) or string commands
-                command = None
+                # One bad command must not end the loop; report it and keep listening
                 try:
-                    cmd_data = json.loads(line)
-                    if cmd_data.get("type") == "SET_CONFIG":
-                        self.config.update(cmd_data.get("data", {}))
-                        logger.info(f"Updated config: {self.config.get('mode')}")
-                        continue # Processed config, move to next line
-                    # If it's a JSON command but not SET_CONFIG, treat it as an unknown JSON command
-                    logger.warning(f"Received unknown JSON command: {cmd_data}")
-                    continue
-                except json.JSONDecodeError:
-                    # Not a JSON command, treat as a string command
-                    command = line
-                
-                if command is None: # Should not happen if JSONDecodeError is caught
-                    continue
-
-                logger.info(f"Received command: {command}")
-                
-                if command == "PING":
-                    self._send_event("STATUS", "READY")
-                elif command == "START_RECORDING":
-                    self.recorder.start_recording()
-                    self.is_live = True
-                    self.partial_thread = threading.Thread(target=self._partial_transcription_worker, daemon=True)
-                    self.partial_thread.start()
-                    self._send_event("STATUS", "RECORDING")
-                
-                elif command == "STOP_RECORDING":
-                    self.is_live = False
-                    audio_data = self.recorder.stop_recording()
-                    if audio_data.size > 0:
-                        self.processing_queue.put(audio_data)
-                    else:
-                        self._send_event("STATUS", "READY")
-                
-                elif command == "EXIT":
-                    self.is_running = False
-                    break
+                    # Handle JSON commands (for config) or string commands
+                    try:
+                        cmd_data = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Not a JSON command, treat as a string command
+                        if not self._handle_command(line):
+                            break
+                        continue
+                    self._handle_json_command(cmd_data)
+                except Exception as e:
+                    logger.error(f"Failed to handle command {line!r}: {e}")
+                    self._send_event("ERROR", str(e))
         except EOFError:
             pass
         except Exception as e:
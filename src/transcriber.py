@@ -1,19 +1,84 @@
 from faster_whisper import WhisperModel
+from faster_whisper.audio import pad_or_trim
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.transcribe import get_compression_ratio, get_suppressed_tokens
 import numpy as np
 import logging
+import math
+import re
 import torch
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Text Whisper produces on silence or noise (normalized: lowercase, no punctuation).
+# These are never real dictation and are always dropped.
+HALLUCINATION_PHRASES = frozenset({
+    "thanks for watching",
+    "thank you for watching",
+    "thanks for watching and ill see you next time",
+    "please subscribe",
+    "like and subscribe",
+    "dont forget to like and subscribe",
+    "subtitles by the amaraorg community",
+    "transcription by castingwords",
+    "subtitles by",
+    "music",
+    "applause",
+})
+
+# Plausible dictation that is also a common hallucination; dropped only when the
+# model itself is unsure there was speech.
+AMBIGUOUS_PHRASES = frozenset({
+    "you",
+    "thank you",
+    "thanks",
+    "bye",
+    "okay",
+    "so",
+})
+
+def _normalize_phrase(text):
+    # Digits stay so numeric dictation ("42", "$100") never normalizes to nothing
+    return " ".join(re.sub(r"[^a-z0-9 ]+", "", text.lower()).split())
+
+def discard_reason(text, avg_logprob, no_speech_prob, compression_ratio,
+                   min_confidence=0.2, no_speech_threshold=0.6, compression_ratio_threshold=2.4):
+    """
+    Decides whether a decoded segment should be dropped.
+    Returns None to keep it, otherwise a short reason string.
+    """
+    if not text.strip():
+        return "empty"
+    # Table lookups use the normalized form; scoring rules below apply to everything
+    phrase = _normalize_phrase(text)
+    if phrase in HALLUCINATION_PHRASES:
+        return "hallucination_phrase"
+    if phrase in AMBIGUOUS_PHRASES and no_speech_prob > 0.2:
+        return "hallucination_phrase"
+    if compression_ratio > compression_ratio_threshold:
+        return "repetitive"
+    # Same rule Whisper uses to declare a window silent
+    if no_speech_prob > no_speech_threshold and avg_logprob < -1.0:
+        return "no_speech"
+    if segment_confidence(avg_logprob, no_speech_prob) < min_confidence:
+        return "low_confidence"
+    return None
+
+def segment_confidence(avg_logprob, no_speech_prob):
+    """Combines token likelihood and speech probability into a 0-1 score."""
+    return math.exp(avg_logprob) * (1.0 - no_speech_prob)
+
 class Transcriber:
-    def __init__(self, model_size="base.en", device=None, compute_type=None):
+    def __init__(self, model_size="base.en", device=None, compute_type=None, cpu_threads=4, num_workers=1):
         """
         Initializes the Faster-Whisper model.
         
         model_size: "tiny.en", "base.en", "small.en", "medium.en", "large-v3"
         device: "cpu", "cuda" (defaults to auto-detect)
         compute_type: "float32", "int8", "float16", or None (auto-detect)
+        cpu_threads: CTranslate2 threads per worker (see ResourceManager.plan_threads)
+        num_workers: Parallel decodes allowed when called from several threads
         """
         if device is None:
             device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -21,12 +86,14 @@ class Transcriber:
         if compute_type is None:
             compute_type = "float16" if device == "cuda" else "int8"
             
-        logger.info(f"Initializing Whisper model '{model_size}' on '{device}' ({compute_type})...")
+        logger.info(f"Initializing Whisper model '{model_size}' on '{device}' ({compute_type}, "
+                    f"{cpu_threads} threads x {num_workers} workers)...")
         self.model = WhisperModel(
             model_size, 
             device=device, 
             compute_type=compute_type,
-            cpu_threads=4 # Limit CPU threads to reduce system load during transcription
+            cpu_threads=cpu_threads,
+            num_workers=num_workers
         )
 
     def transcribe(self, audio_data):
@@ -34,8 +101,16 @@ class Transcriber:
         Transcribes the provided audio data (numpy array).
         Returns the stitched together text.
         """
+        text, _ = self.transcribe_with_report(audio_data)
+        return text
+
+    def transcribe_with_report(self, audio_data):
+        """
+        Like transcribe(), but also returns the segments that were dropped as
+        low-confidence or hallucinated: a list of {"text", "reason", "confidence"}.
+        """
         if audio_data.size < 8000: # Discard if less than 500ms
-            return ""
+            return "", []
 
         # faster-whisper expects a 1D float32 array
         if len(audio_data.shape) > 1:
@@ -47,6 +122,79 @@ class Transcriber:
             beam_size=1
         )
         
-        text = "".join([segment.text for segment in segments]).strip()
+        kept = []
+        discards = []
+        for segment in segments:
+            reason = discard_reason(segment.text, segment.avg_logprob,
+                                    segment.no_speech_prob, segment.compression_ratio)
+            if reason is None:
+                kept.append(segment.text)
+            else:
+                discards.append({
+                    "text": segment.text.strip(),
+                    "reason": reason,
+                    "confidence": round(segment_confidence(segment.avg_logprob, segment.no_speech_prob), 3)
+                })
+
+        text = "".join(kept).strip()
+        if discards:
+            logger.info(f"Discarded segments: {discards}")
         logger.info(f"Transcription complete: '{text}' (Language: {info.language})")
-        return text
+        return text, discards
+
+    def transcribe_batch(self, audio_list):
+        """
+        Transcribes several independent clips with a single batched CTranslate2 decode.
+        Returns one text per clip, in order. Clips longer than one 30s window
+        fall back to the sequential transcribe() path. Clips are decoded as English
+        without language detection, so this is meant for ".en" models.
+        """
+        texts = [""] * len(audio_list)
+        batch_indices = []
+        features = []
+
+        for i, audio_data in enumerate(audio_list):
+            if len(audio_data.shape) > 1:
+                audio_data = audio_data.flatten()
+            if audio_data.size < 8000: # Discard if less than 500ms
+                continue
+            if audio_data.size > 30 * 16000:
+                texts[i] = self.transcribe(audio_data)
+                continue
+            batch_indices.append(i)
+            features.append(pad_or_trim(self.model.feature_extractor(audio_data)[..., :-1]))
+
+        if not features:
+            return texts
+
+        tokenizer = Tokenizer(
+            self.model.hf_tokenizer,
+            self.model.model.is_multilingual,
+            task="transcribe",
+            language="en"
+        )
+        prompt = self.model.get_prompt(tokenizer, previous_tokens=[], without_timestamps=True)
+        encoder_output = self.model.encode(np.stack(features))
+        results = self.model.model.generate(
+            encoder_output,
+            [list(prompt) for _ in features],
+            beam_size=1,
+            max_length=self.model.max_length,
+            suppress_blank=True,
+            suppress_tokens=get_suppressed_tokens(tokenizer, [-1]),
+            return_scores=True,
+            return_no_speech_prob=True
+        )
+
+        for i, result in zip(batch_indices, results):
+            tokens = result.sequences_ids[0]
+            text = tokenizer.decode(tokens).strip()
+            avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+            reason = discard_reason(text, avg_logprob, result.no_speech_prob, get_compression_ratio(text))
+            if reason is None:
+                texts[i] = text
+            elif text:
+                logger.info(f"Discarded batched clip {i} ({reason}): '{text}'")
+
+        logger.info(f"Batched transcription complete: {len(features)} clips in one decode")
+        return texts
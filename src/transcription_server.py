@@ -0,0 +1,286 @@
+import sys
+import os
+import json
+import logging
+import threading
+import queue
+import time
+import argparse
+import numpy as np
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add src to path if needed for relative imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from transcriber import Transcriber
+from resource_manager import ResourceManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger("MikeWhisperServer")
+
+class TranscriptionJob:
+    def __init__(self, client_id, audio_data):
+        self.client_id = client_id
+        self.audio_data = audio_data
+        self.submitted_at = time.time()
+        self.done = threading.Event()
+        self.cancelled = False # Client gave up; skip instead of decoding
+        self.text = ""
+        self.error = None
+        self.batch_size = 0
+        self.queue_ms = 0.0
+        self.decode_ms = 0.0
+
+class BatchScheduler:
+    def __init__(self, transcriber, max_batch_size=8, batch_window=0.05, max_queue_per_client=4):
+        """
+        Shares one Transcriber between many clients.
+
+        max_batch_size: Most clips decoded together in one CTranslate2 call.
+        batch_window: Seconds to wait for more requests after the first one arrives.
+        max_queue_per_client: Pending requests allowed per client before rejecting.
+        """
+        self.transcriber = transcriber
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.max_queue_per_client = max_queue_per_client
+
+        # Per-client FIFO queues; dict order is the round-robin order
+        self.client_queues = OrderedDict()
+        self.condition = threading.Condition()
+        self.is_running = False
+        self.worker_thread = None
+
+        self.stats = {
+            "requests": 0,
+            "rejected": 0,
+            "batches": 0,
+            "batch_sizes": {},
+            "last_decode_ms": 0.0,
+        }
+
+    def start(self):
+        self.is_running = True
+        self.worker_thread = threading.Thread(target=self._batch_worker, daemon=True)
+        self.worker_thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.is_running = False
+            self.condition.notify_all()
+
+    def submit(self, client_id, audio_data):
+        """Queues audio for a client. Raises queue.Full if the client is over its limit."""
+        job = TranscriptionJob(client_id, audio_data)
+        with self.condition:
+            client_queue = self.client_queues.setdefault(client_id, deque())
+            if len(client_queue) >= self.max_queue_per_client:
+                self.stats["rejected"] += 1
+                raise queue.Full(f"Client '{client_id}' already has {len(client_queue)} pending requests")
+            client_queue.append(job)
+            self.stats["requests"] += 1
+            self.condition.notify()
+        return job
+
+    def _pending_count(self):
+        return sum(len(q) for q in self.client_queues.values())
+
+    def cancel(self, job):
+        """Drops a job whose client stopped waiting, freeing its queue slot."""
+        with self.condition:
+            job.cancelled = True
+            client_queue = self.client_queues.get(job.client_id)
+            if client_queue is not None and job in client_queue:
+                client_queue.remove(job)
+                if not client_queue:
+                    del self.client_queues[job.client_id]
+
+    def _take_batch(self):
+        """Takes up to max_batch_size jobs, one per client per pass, so no client can starve others."""
+        batch = []
+        served = []
+        while len(batch) < self.max_batch_size and self._pending_count():
+            for client_id, client_queue in list(self.client_queues.items()):
+                if len(batch) >= self.max_batch_size:
+                    break
+                if client_queue:
+                    job = client_queue.popleft()
+                    if job.cancelled:
+                        continue
+                    batch.append(job)
+                    if client_id not in served:
+                        served.append(client_id)
+
+        # Served clients go to the back of the line for the next batch
+        for client_id in served:
+            if self.client_queues[client_id]:
+                self.client_queues.move_to_end(client_id)
+        for client_id in [cid for cid, q in self.client_queues.items() if not q]:
+            del self.client_queues[client_id]
+        return batch
+
+    def _batch_worker(self):
+        logger.info("Batch worker started...")
+        while True:
+            with self.condition:
+                while self.is_running and not self._pending_count():
+                    self.condition.wait()
+                if not self.is_running:
+                    break
+
+                # Give concurrent clients a short window to join this batch
+                deadline = time.time() + self.batch_window
+                while self._pending_count() < self.max_batch_size:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+                batch = self._take_batch()
+
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        start_time = time.time()
+        try:
+            texts = self.transcriber.transcribe_batch([job.audio_data for job in batch])
+            error = None
+        except Exception as e:
+            logger.error(f"Batched transcription failed: {e}")
+            texts = [""] * len(batch)
+            error = str(e)
+        decode_ms = (time.time() - start_time) * 1000
+
+        with self.condition:
+            self.stats["batches"] += 1
+            sizes = self.stats["batch_sizes"]
+            sizes[len(batch)] = sizes.get(len(batch), 0) + 1
+            self.stats["last_decode_ms"] = round(decode_ms, 1)
+
+        for job, text in zip(batch, texts):
+            job.text = text
+            job.error = error
+            job.batch_size = len(batch)
+            job.queue_ms = (start_time - job.submitted_at) * 1000
+            job.decode_ms = decode_ms
+            job.done.set()
+
+    def get_stats(self):
+        with self.condition:
+            stats = dict(self.stats)
+            stats["batch_sizes"] = {str(k): v for k, v in sorted(self.stats["batch_sizes"].items())}
+            stats["queue_depth"] = self._pending_count()
+            stats["client_queue_depth"] = {cid: len(q) for cid, q in self.client_queues.items()}
+            total = sum(size * count for size, count in self.stats["batch_sizes"].items())
+        stats["avg_batch_size"] = round(total / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+class TranscriptionRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /transcribe  body: raw little-endian float32 mono 16kHz PCM
+                      header X-Client-Id identifies the client for fair queueing.
+    GET  /stats       queue depth and batch size statistics.
+
+    X-Client-Id is trusted as sent, so a client that rotates ids gets a fresh queue
+    (and round-robin turn) for each one. Fairness only holds between cooperating
+    clients; bind to localhost or put an authenticating proxy in front otherwise.
+    """
+    scheduler = None
+    request_timeout = 60.0
+    max_body_bytes = 30 * 16000 * 4 # 30s of float32 audio, one decode window
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.scheduler.get_stats())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/transcribe":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self._send_json(400, {"error": "Invalid Content-Length"})
+            return
+        if length <= 0 or length % 4:
+            self._send_json(400, {"error": "Body must be float32 PCM samples"})
+            return
+        if length > self.max_body_bytes:
+            self._send_json(413, {"error": f"Audio longer than {self.max_body_bytes // (16000 * 4)}s"})
+            return
+        audio_data = np.frombuffer(self.rfile.read(length), dtype="<f4").astype(np.float32)
+        client_id = self.headers.get("X-Client-Id") or self.client_address[0]
+
+        try:
+            job = self.scheduler.submit(client_id, audio_data)
+        except queue.Full as e:
+            self._send_json(429, {"error": str(e)})
+            return
+
+        if not job.done.wait(self.request_timeout):
+            self.scheduler.cancel(job)
+            self._send_json(504, {"error": "Transcription timed out"})
+            return
+        if job.error:
+            self._send_json(500, {"error": job.error})
+            return
+
+        self._send_json(200, {
+            "text": job.text,
+            "batch_size": job.batch_size,
+            "queue_ms": round(job.queue_ms, 1),
+            "decode_ms": round(job.decode_ms, 1)
+        })
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+def run_server(host="127.0.0.1", port=8765, model_size="base.en", max_batch_size=8, batch_window=0.05):
+    # transcribe_batch decodes every clip as English, so only English-only models are served
+    if not model_size.endswith(".en"):
+        raise ValueError(f"Server requires an English-only model (e.g. base.en), got '{model_size}'")
+    resources = ResourceManager()
+    logger.info(f"Resource plan: {resources.report()}")
+    transcriber = Transcriber(model_size=model_size, **resources.plan_threads())
+    scheduler = BatchScheduler(transcriber, max_batch_size=max_batch_size, batch_window=batch_window)
+    scheduler.start()
+
+    TranscriptionRequestHandler.scheduler = scheduler
+    server = ThreadingHTTPServer((host, port), TranscriptionRequestHandler)
+    logger.info(f"--- MikeWhisper server listening on http://{host}:{port} ---")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    finally:
+        scheduler.stop()
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared-model MikeWhisper transcription server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default="base.en")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--batch-window-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    if not args.model.endswith(".en"):
+        parser.error("--model must be an English-only model (e.g. base.en, small.en)")
+    run_server(args.host, args.port, args.model, args.max_batch, args.batch_window_ms / 1000)
@@ -0,0 +1,65 @@
+import numpy as np
+import logging
+import re
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class WakeWordDetector:
+    def __init__(self, transcriber, wake_phrases=("hey mike",)):
+        """
+        Detects a wake phrase in short speech windows.
+
+        transcriber: A small Transcriber (e.g. "tiny.en") used only for wake windows,
+                     so the main model stays idle until the phrase is heard.
+        wake_phrases: Phrases to match, compared after lowercasing and stripping punctuation.
+        """
+        self.transcriber = transcriber
+        self.set_wake_phrases(wake_phrases)
+
+    def set_wake_phrases(self, wake_phrases):
+        self.wake_phrases = [self._normalize(p) for p in wake_phrases if p.strip()]
+
+    @staticmethod
+    def _normalize(text):
+        text = re.sub(r"[^a-z0-9' ]+", " ", text.lower())
+        return " ".join(text.split())
+
+    def strip_wake_phrase(self, text):
+        """Removes everything up to and including the first wake phrase in text."""
+        words = text.split()
+        normalized = [self._normalize(word) for word in words]
+        for phrase in self.wake_phrases:
+            phrase_words = phrase.split()
+            for start in range(len(words)):
+                # Walk forward matching phrase words, skipping tokens that were pure punctuation
+                i, matched = start, 0
+                while i < len(words) and matched < len(phrase_words):
+                    if not normalized[i]:
+                        i += 1
+                        continue
+                    if normalized[i] != phrase_words[matched]:
+                        break
+                    i += 1
+                    matched += 1
+                if matched == len(phrase_words) and normalized[start]:
+                    rest = " ".join(words[i:]).lstrip(" ,.!?;:-")
+                    return rest[:1].upper() + rest[1:]
+        return text
+
+    def detect(self, audio_data):
+        """Returns True if the window contains any of the wake phrases."""
+        # Short phrases can fall under the transcriber's 500ms floor; pad with silence
+        if audio_data.size < 16000:
+            audio_data = np.pad(audio_data, (0, 16000 - audio_data.size))
+        text = self.transcriber.transcribe(audio_data)
+        if not text:
+            return False
+
+        # Pad with spaces so phrases only match on word boundaries ("they mike" != "hey mike")
+        heard = f" {self._normalize(text)} "
+        for phrase in self.wake_phrases:
+            if phrase and f" {phrase} " in heard:
+                logger.info(f"Wake phrase detected: '{heard.strip()}'")
+                return True
+        return False
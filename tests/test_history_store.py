@@ -0,0 +1,67 @@
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.history_store import HistoryStore
+
+def test_history_store_and_search():
+    db_path = os.path.join(tempfile.mkdtemp(), "history.db")
+    store = HistoryStore(db_path=db_path)
+
+    for i in range(2000):
+        store.add(f"note number {i} about groceries", f"Note {i} about groceries.", mode="raw",
+                  audio_duration=1.5, timings={"transcribe_ms": 120.0})
+    audio = np.sin(np.linspace(0, 100, 16000)).astype(np.float32) * 0.5
+    entry_id = store.add("email the quarterly report to Dana", "Email the quarterly report to Dana.",
+                         mode="email", audio_duration=1.0, audio_data=audio)
+    store.flush()
+
+    start_time = time.perf_counter()
+    results = store.search("quarterly rep")
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    print(f"Search returned {len(results)} result(s) in {elapsed_ms:.2f}ms")
+    assert len(results) == 1
+    assert results[0]["entry_id"] == entry_id
+    assert results[0]["mode"] == "email"
+
+    # Punctuation in queries must not break the FTS syntax
+    assert store.search('groceries "(') != []
+
+    restored = store.load_audio(entry_id)
+    assert restored is not None and restored.size == audio.size
+    assert np.max(np.abs(restored - audio)) < 1e-3
+
+    store.update_formatted_text(entry_id, "Please email the Q3 report to Dana.")
+    store.flush()
+    assert store.search("Q3")[0]["entry_id"] == entry_id
+    store.close()
+
+def test_retained_audio_is_pruned():
+    db_path = os.path.join(tempfile.mkdtemp(), "history.db")
+    store = HistoryStore(db_path=db_path, max_audio_entries=2)
+    audio = np.full(16000, 0.25, dtype=np.float32)
+    entry_ids = [store.add(f"clip {i}", f"Clip {i}.", audio_data=audio) for i in range(3)]
+    store.flush()
+
+    # Only the newest clips keep their audio; the transcripts all stay searchable
+    assert store.load_audio(entry_ids[0]) is None
+    assert store.load_audio(entry_ids[2]) is not None
+    assert len(store.search("clip")) == 3
+    store.close()
+
+    # Reopening with an age limit expires audio older than the cutoff
+    store = HistoryStore(db_path=db_path, max_audio_age_days=0)
+    store.add("fresh clip", "Fresh clip.")
+    store.flush()
+    assert store.load_audio(entry_ids[2]) is None
+    store.close()
+
+if __name__ == "__main__":
+    test_history_store_and_search()
+    test_retained_audio_is_pruned()
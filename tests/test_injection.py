@@ -5,7 +5,7 @@ import time
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.injector import TextInjector
+from src.injector import TextInjector, RecordingBackend
 
 def test_injection():
     injector = TextInjector()
@@ -23,5 +23,70 @@ def test_injection():
     
     print("\nInjection command sent. Check your active window.")
 
+def test_injection_with_recording_backend():
+    backend = RecordingBackend(clipboard="user clipboard")
+    injector = TextInjector(backend=backend)
+
+    # Short single-line text is typed in one batch, clipboard untouched
+    injector.inject("Hello there")
+    assert backend.calls == [("type", "Hello there")]
+    assert backend.clipboard == "user clipboard"
+
+    # Multi-line text is pasted and the user's clipboard restored afterwards
+    backend.calls = []
+    latency_ms = injector.inject("- Point 1\n- Point 2")
+    assert ("paste", "- Point 1\n- Point 2") in backend.calls
+    # Restore happens later so slow targets can still read the pasted text
+    assert backend.clipboard == "- Point 1\n- Point 2"
+    injector.finish_pending_restore()
+    assert backend.clipboard == "user clipboard"
+
+    print(f"Injection latency: {latency_ms:.1f}ms, stats: {injector.stats}")
+    assert injector.stats["count"] == 2
+    assert latency_ms < 100 # Clipboard restore is off the latency path
+
+def test_clipboard_restored_when_paste_fails():
+    class FailingBackend(RecordingBackend):
+        def send_paste(self):
+            raise RuntimeError("paste blocked")
+
+    backend = FailingBackend(clipboard="user clipboard")
+    injector = TextInjector(backend=backend)
+    injector.inject("Line one\nLine two")
+
+    # Fell back to typing, and the user's clipboard still comes back
+    assert ("type", "Line one\nLine two") in backend.calls
+    injector.finish_pending_restore()
+    assert backend.clipboard == "user clipboard"
+
+def test_stale_restore_does_not_clobber_next_paste():
+    class RacingBackend(RecordingBackend):
+        stale_restore = None
+
+        def send_paste(self):
+            # A restore timer from the previous paste that already fired (so cancel()
+            # couldn't stop it) gets the lock between set_clipboard and Ctrl+V
+            if self.stale_restore:
+                restore, self.stale_restore = self.stale_restore, None
+                restore()
+            super().send_paste()
+
+    backend = RacingBackend(clipboard="USER")
+    injector = TextInjector(backend=backend)
+
+    injector.inject("First segment\nof dictation")
+    stale_generation = injector._restore_generation
+    backend.stale_restore = lambda: injector._restore_clipboard(stale_generation)
+
+    injector.inject("Second segment\nof dictation")
+    assert backend.calls[-1] == ("paste", "Second segment\nof dictation")
+
+    # The user's clipboard still comes back once the latest paste settles
+    injector.finish_pending_restore()
+    assert backend.clipboard == "USER"
+
 if __name__ == "__main__":
+    test_injection_with_recording_backend()
+    test_clipboard_restored_when_paste_fails()
+    test_stale_restore_does_not_clobber_next_paste()
     test_injection()
@@ -0,0 +1,105 @@
+import sys
+import os
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.audio_recorder as audio_recorder
+
+class FakeStream:
+    def __init__(self, **kwargs):
+        self.active = False
+
+    def start(self):
+        self.active = True
+
+    def stop(self):
+        self.active = False
+
+    def close(self):
+        pass
+
+class FakeVAD:
+    """Treats any chunk louder than 0.1 as speech."""
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+
+    def reset_states(self):
+        pass
+
+    def process_chunk(self, audio_chunk):
+        return 1.0 if np.max(np.abs(audio_chunk)) > 0.1 else 0.0
+
+def make_recorder():
+    # Swap out the microphone stream and Silero VAD so no hardware or model is needed
+    original = (audio_recorder.sd.InputStream, audio_recorder.StreamingSileroVAD)
+    audio_recorder.sd.InputStream = FakeStream
+    audio_recorder.StreamingSileroVAD = FakeVAD
+    try:
+        recorder = audio_recorder.AudioRecorder()
+    finally:
+        audio_recorder.sd.InputStream, audio_recorder.StreamingSileroVAD = original
+    recorder.start_listening()
+    return recorder
+
+def block(level):
+    return np.full((1536, 1), level, dtype=np.float32)
+
+def feed(recorder, *levels):
+    for level in levels:
+        recorder._audio_callback(block(level), 1536, None, None)
+
+def test_energy_gate_skips_vad():
+    recorder = make_recorder()
+    feed(recorder, 0.0, 0.001, 0.05, 0.5)
+
+    stats = recorder.listen_stats
+    print(f"Listen stats: {stats}")
+    assert stats["blocks"] == 4
+    assert stats["energy_gated"] == 2 # Below the floor, VAD never ran
+    assert stats["vad_runs"] == 2
+
+def test_window_survives_short_pause():
+    recorder = make_recorder()
+
+    # "hey" <one quiet block> "mike" then silence: still one window
+    feed(recorder, 0.5, 0.0, 0.5, 0.0, 0.0)
+    assert recorder.wake_queue.empty()
+    feed(recorder, 0.0)
+
+    window = recorder.wake_queue.get_nowait()
+    assert window.size == 6 * 1536
+    assert recorder.wake_queue.empty()
+    assert recorder.listen_stats["wake_windows"] == 1
+
+def test_full_queue_drops_windows():
+    recorder = make_recorder()
+    for _ in range(recorder.wake_queue.maxsize + 2):
+        feed(recorder, 0.5, 0.0, 0.0, 0.0)
+
+    stats = recorder.listen_stats
+    assert stats["wake_windows"] == recorder.wake_queue.maxsize
+    assert stats["wake_windows_dropped"] == 2
+
+def test_wake_recording_keeps_following_speech():
+    recorder = make_recorder()
+
+    # Wake window is emitted, then the user keeps talking while it is being checked
+    feed(recorder, 0.5, 0.5, 0.0, 0.0, 0.0)
+    window = recorder.wake_queue.get_nowait()
+    feed(recorder, 0.4, 0.4)
+
+    recorder.start_recording(preroll=[window])
+    feed(recorder, 0.3)
+    audio = recorder.stop_recording()
+
+    # Wake window, the two blocks said during detection, then the live block
+    assert audio.size == window.size + 3 * 1536
+    assert np.allclose(audio[window.size:window.size + 1536], 0.4)
+
+if __name__ == "__main__":
+    test_energy_gate_skips_vad()
+    test_window_survives_short_pause()
+    test_full_queue_drops_windows()
+    test_wake_recording_keeps_following_speech()
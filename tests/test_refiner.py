@@ -0,0 +1,85 @@
+import sys
+import os
+import threading
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.refiner import BackgroundRefiner, word_diff
+
+class FakeTranscriber:
+    def transcribe(self, audio_data):
+        return "Send the report to Dana on Friday."
+
+def test_word_diff():
+    diff = word_diff("send the report to Donna friday", "send the report to Dana on friday")
+    print(f"Diff: {diff}")
+    assert diff == [{"op": "replace", "from": "Donna", "to": "Dana on"}]
+    assert word_diff("same text", "same text") == []
+
+def test_refiner_waits_loads_lazily_and_unloads():
+    busy = threading.Event()
+    busy.set()
+    done = threading.Event()
+    loads = []
+    results = []
+
+    def factory():
+        loads.append(1)
+        return FakeTranscriber()
+
+    def on_result(result):
+        results.append(result)
+        done.set()
+
+    refiner = BackgroundRefiner(factory, on_result, is_busy=busy.is_set, idle_timeout=0.0)
+    refiner.busy_poll = 0.01
+    assert refiner.transcriber is None # Nothing loaded until the first job
+
+    refiner.submit(np.zeros(16000, dtype=np.float32), "Send the report to Donna Friday.", entry_id="abc")
+    assert not done.wait(0.2) # Held back while live dictation is busy
+    busy.clear()
+    assert done.wait(5)
+
+    assert loads == [1]
+    assert results[0]["entry_id"] == "abc"
+    assert results[0]["diff"]
+
+    # With a zero idle timeout the model is dropped on the next idle tick
+    refiner.job_queue.join()
+    for _ in range(30):
+        if refiner.transcriber is None:
+            break
+        threading.Event().wait(0.1)
+    assert refiner.transcriber is None
+    refiner.stop()
+
+def test_refiner_yields_between_chunks():
+    busy = threading.Event()
+    done = threading.Event()
+    chunk_sizes = []
+
+    class ChunkTranscriber:
+        def transcribe(self, audio_data):
+            chunk_sizes.append(audio_data.size)
+            if len(chunk_sizes) == 1:
+                busy.set() # Live dictation starts right after the first chunk
+            return "chunk"
+
+    refiner = BackgroundRefiner(ChunkTranscriber, lambda result: done.set(), is_busy=busy.is_set)
+    refiner.busy_poll = 0.01
+    refiner.chunk_samples = 16000
+    refiner.submit(np.zeros(40000, dtype=np.float32), "original")
+
+    assert not done.wait(0.2)
+    assert chunk_sizes == [16000] # Paused before the second chunk
+    busy.clear()
+    assert done.wait(5)
+    assert chunk_sizes == [16000, 16000, 8000]
+    refiner.stop()
+
+if __name__ == "__main__":
+    test_word_diff()
+    test_refiner_waits_loads_lazily_and_unloads()
+    test_refiner_yields_between_chunks()
@@ -0,0 +1,39 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.resource_manager import ResourceManager
+
+def test_thread_plan_scales_with_cores():
+    manager = ResourceManager()
+
+    manager.physical_cores = 4
+    laptop = manager.plan_threads()
+    print(f"4-core plan: {laptop}")
+    assert laptop == {"cpu_threads": 3, "num_workers": 1} # One core left for audio/UI
+
+    manager.physical_cores = 16
+    desktop = manager.plan_threads()
+    print(f"16-core plan: {desktop}")
+    assert desktop == {"cpu_threads": 15, "num_workers": 1} # A single final decode uses the machine
+
+    manager.physical_cores = 1
+    assert manager.plan_threads()["cpu_threads"] == 1
+
+def test_partials_pause_under_load():
+    manager = ResourceManager(high_load_threshold=0.5)
+
+    manager.system_load = lambda: 0.9
+    assert manager.should_pause_partials()
+    manager.system_load = lambda: 0.1
+    assert not manager.should_pause_partials()
+    manager.system_load = lambda: None # Unknown load never blocks partials
+    assert not manager.should_pause_partials()
+
+    assert manager.report()["partials_paused"] == 1
+
+if __name__ == "__main__":
+    test_thread_plan_scales_with_cores()
+    test_partials_pause_under_load()
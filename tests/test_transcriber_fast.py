@@ -5,7 +5,7 @@ import numpy as np
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.transcriber import Transcriber
+from src.transcriber import Transcriber, discard_reason
 
 def test_transcriber_initialization_and_transcribe():
     print("Initializing transcriber with base.en to test compute_type auto-detection...")
@@ -21,5 +21,25 @@ def test_transcriber_initialization_and_transcribe():
     assert text == "" # VAD filter should prevent any text from being transcribed from silence
     print("✅ SUCCESS: Transcriber initialized and transcribed without errors.")
 
+def test_discard_reason_filters_hallucinations():
+    # Confident, ordinary dictation is kept
+    assert discard_reason(" Send the report by Friday.", -0.2, 0.01, 1.1) is None
+    # Subtitle credits are dropped regardless of scores
+    assert discard_reason(" Thanks for watching!", -0.1, 0.0, 1.0) == "hallucination_phrase"
+    assert discard_reason(" Thanks  for watching.", -0.1, 0.0, 1.0) == "hallucination_phrase"
+    assert discard_reason(" Thanks - for watching", -0.1, 0.0, 1.0) == "hallucination_phrase"
+    # Numbers and amounts are real dictation, not empty output
+    for number in (" 42.", " 3.14", " $100", " 2025", " €5"):
+        assert discard_reason(number, -0.2, 0.25, 1.0) is None, number
+    assert discard_reason("   ", -0.2, 0.0, 1.0) == "empty"
+    # "Thank you." is only dropped when the model doubts there was speech
+    assert discard_reason(" Thank you.", -0.3, 0.05, 1.0) is None
+    assert discard_reason(" Thank you.", -0.3, 0.5, 1.0) == "hallucination_phrase"
+    assert discard_reason(" the the the the the the", -0.4, 0.1, 3.2) == "repetitive"
+    assert discard_reason(" Hmm hello", -1.4, 0.8, 1.0) == "no_speech"
+    assert discard_reason(" Something muffled", -2.5, 0.1, 1.0) == "low_confidence"
+    print("✅ SUCCESS: Low-confidence and hallucinated segments are discarded.")
+
 if __name__ == "__main__":
+    test_discard_reason_filters_hallucinations()
     test_transcriber_initialization_and_transcribe()
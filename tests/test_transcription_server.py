@@ -0,0 +1,106 @@
+import sys
+import os
+import queue
+import threading
+import http.client
+import numpy as np
+from http.server import ThreadingHTTPServer
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.transcription_server import BatchScheduler, TranscriptionRequestHandler, run_server
+
+class FakeTranscriber:
+    def __init__(self):
+        self.batches = []
+
+    def transcribe_batch(self, audio_list):
+        self.batches.append(len(audio_list))
+        return [f"clip {int(audio[0])}" for audio in audio_list]
+
+def test_batches_are_fair_across_clients():
+    scheduler = BatchScheduler(FakeTranscriber(), max_batch_size=3, max_queue_per_client=8)
+
+    # One noisy client queues four clips before a quiet client queues one
+    for i in range(4):
+        scheduler.submit("noisy", np.full(16000, i, dtype=np.float32))
+    scheduler.submit("quiet", np.full(16000, 9, dtype=np.float32))
+
+    batch = scheduler._take_batch()
+    clients = [job.client_id for job in batch]
+
+    print(f"First batch clients: {clients}")
+    assert len(batch) == 3
+    assert "quiet" in clients
+
+def test_batch_results_and_stats():
+    transcriber = FakeTranscriber()
+    scheduler = BatchScheduler(transcriber, max_batch_size=4, batch_window=0.2)
+    scheduler.start()
+
+    jobs = [scheduler.submit(f"client-{i}", np.full(16000, i, dtype=np.float32)) for i in range(3)]
+    for job in jobs:
+        assert job.done.wait(5)
+    scheduler.stop()
+
+    assert [job.text for job in jobs] == ["clip 0", "clip 1", "clip 2"]
+    stats = scheduler.get_stats()
+    print(f"Scheduler stats: {stats}")
+    assert stats["requests"] == 3
+    assert stats["queue_depth"] == 0
+    assert sum(transcriber.batches) == 3
+
+def test_per_client_queue_limit():
+    scheduler = BatchScheduler(FakeTranscriber(), max_queue_per_client=1)
+    scheduler.submit("client", np.zeros(16000, dtype=np.float32))
+    try:
+        scheduler.submit("client", np.zeros(16000, dtype=np.float32))
+        assert False, "Second request should have been rejected"
+    except queue.Full as e:
+        print(f"Rejected as expected: {e}")
+    assert scheduler.get_stats()["rejected"] == 1
+
+def test_cancelled_jobs_are_not_decoded():
+    scheduler = BatchScheduler(FakeTranscriber(), max_batch_size=4, max_queue_per_client=1)
+    abandoned = scheduler.submit("gone", np.full(16000, 1, dtype=np.float32))
+    scheduler.submit("waiting", np.full(16000, 2, dtype=np.float32))
+
+    scheduler.cancel(abandoned)
+    batch = scheduler._take_batch()
+    assert [job.client_id for job in batch] == ["waiting"]
+
+    # The abandoned client's queue slot is free again
+    scheduler.submit("gone", np.full(16000, 3, dtype=np.float32))
+    assert scheduler.get_stats()["rejected"] == 0
+
+def test_bad_content_length_is_rejected():
+    TranscriptionRequestHandler.scheduler = BatchScheduler(FakeTranscriber())
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TranscriptionRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        conn.putrequest("POST", "/transcribe")
+        conn.putheader("Content-Length", "lots")
+        conn.endheaders()
+        response = conn.getresponse()
+        print(f"Bad Content-Length: {response.status} {response.read()}")
+        assert response.status == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_multilingual_model_is_refused():
+    try:
+        run_server(model_size="base")
+        assert False, "Multilingual model should have been refused"
+    except ValueError as e:
+        print(f"Refused as expected: {e}")
+
+if __name__ == "__main__":
+    test_batches_are_fair_across_clients()
+    test_batch_results_and_stats()
+    test_per_client_queue_limit()
+    test_cancelled_jobs_are_not_decoded()
+    test_bad_content_length_is_rejected()
+    test_multilingual_model_is_refused()
@@ -0,0 +1,50 @@
+import sys
+import os
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.wake_word import WakeWordDetector
+
+class FakeTranscriber:
+    def __init__(self, text):
+        self.text = text
+        self.sizes = []
+
+    def transcribe(self, audio_data):
+        self.sizes.append(audio_data.size)
+        return self.text
+
+def detect(heard, phrase="hey mike"):
+    return WakeWordDetector(FakeTranscriber(heard), wake_phrases=[phrase]).detect(np.zeros(8000, dtype=np.float32))
+
+def test_wake_phrase_matching():
+    assert detect("Hey, Mike!")
+    assert detect("  hey   MIKE, start an email")
+    assert detect("Okay hey mike.")
+    # Word boundaries: "they, Mike" must not wake the engine
+    assert not detect("They, Mike said so.")
+    assert not detect("hey mikey")
+    assert not detect("")
+    assert detect("Computer, go", phrase="Computer!")
+    print("✅ SUCCESS: Wake phrases match on normalized word boundaries.")
+
+def test_short_windows_are_padded():
+    transcriber = FakeTranscriber("hey mike")
+    detector = WakeWordDetector(transcriber)
+    detector.detect(np.zeros(3072, dtype=np.float32))
+    assert transcriber.sizes == [16000] # Padded past the transcriber's 500ms floor
+
+def test_strip_wake_phrase():
+    detector = WakeWordDetector(FakeTranscriber(""))
+    assert detector.strip_wake_phrase("Hey, Mike, start an email to Dana.") == "Start an email to Dana."
+    assert detector.strip_wake_phrase("um hey mike - take a note") == "Take a note"
+    assert detector.strip_wake_phrase("Hey Mike.") == ""
+    # Without the phrase (or only a look-alike) the text is left alone
+    assert detector.strip_wake_phrase("They, Mike said so.") == "They, Mike said so."
+
+if __name__ == "__main__":
+    test_wake_phrase_matching()
+    test_short_windows_are_padded()
+    test_strip_wake_phrase()